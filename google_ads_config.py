@@ -13,8 +13,17 @@ Required environment variables:
 ``GOOGLE_ADS_CLIENT_SECRET``        OAuth2 client secret.
 ``GOOGLE_ADS_REFRESH_TOKEN``        OAuth2 refresh token.
 
-``GOOGLE_ADS_USE_PROTO_PLUS`` and ``GOOGLE_ADS_ACCESS_TOKEN`` are optional and
-default to ``True`` and an empty string respectively.
+``GOOGLE_ADS_ACCESS_TOKEN`` is optional and defaults to an empty string.
+
+``GOOGLE_ADS_MAX_CONCURRENT_QUERIES`` optionally sets how many accounts are
+queried at once and defaults to ``16``.  Raise it as far as the developer
+token's request quota allows.
+
+``GOOGLE_ADS_OUTPUT_FORMAT`` optionally selects the output file format, either
+``json`` (the default) or ``parquet``.  Parquet output requires ``pyarrow``.
+
+``GOOGLE_ADS_ENDPOINT`` optionally overrides the API endpoint.  The endpoint
+must present a TLS certificate for ``googleads.googleapis.com``.
 """
 
 import os
@@ -25,10 +34,8 @@ GOOGLE_ADS_CONFIG = {
     "client_id": os.getenv("GOOGLE_ADS_CLIENT_ID", ""),
     "client_secret": os.getenv("GOOGLE_ADS_CLIENT_SECRET", ""),
     "refresh_token": os.getenv("GOOGLE_ADS_REFRESH_TOKEN", ""),
-    "use_proto_plus": os.getenv("GOOGLE_ADS_USE_PROTO_PLUS", "True").lower() in (
-        "true",
-        "1",
-        "yes",
-    ),
     "access_token": os.getenv("GOOGLE_ADS_ACCESS_TOKEN", ""),
+    "max_concurrent_queries": os.getenv("GOOGLE_ADS_MAX_CONCURRENT_QUERIES", "16"),
+    "output_format": os.getenv("GOOGLE_ADS_OUTPUT_FORMAT", "json").lower(),
+    "endpoint": os.getenv("GOOGLE_ADS_ENDPOINT", ""),
 }
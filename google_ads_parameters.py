@@ -1,25 +1,60 @@
+import hashlib
 import json
 import logging
-from datetime import datetime, timedelta, timezone
-from collections import deque
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
 
 # Third-party libraries for Google Ads API
+from google.ads.googleads import client as googleads_client
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials as GoogleCredentials
 from dotenv import load_dotenv
+import grpc
+import orjson
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
-# --- Configuration ---
-
-# Loads environment variables from a .env file for secure credential management.
-load_dotenv()
 try:
-    # Imports the configuration dictionary from a local file.
-    from google_ads_config import GOOGLE_ADS_CONFIG
+    # Parquet output is optional and only requires pyarrow when it is selected.
+    import pyarrow
+    import pyarrow.parquet
 except ImportError:
-    print("Error: A google_ads_config.py file with a GOOGLE_ADS_CONFIG dictionary is required.")
-    exit()
+    pyarrow = None
+
+# --- Configuration ---
+
+def load_config() -> dict | None:
+    """
+    Loads the script's configuration dictionary.
+
+    Environment variables from a .env file are loaded first, since the config
+    module reads credentials from the environment when it is imported. This runs
+    from main(), so importing this module does not touch the environment.
+
+    Returns:
+        The GOOGLE_ADS_CONFIG dictionary, or None if google_ads_config.py is missing.
+    """
+    # Loads environment variables from a .env file for secure credential management.
+    load_dotenv()
+    try:
+        # Imports the configuration dictionary from a local file.
+        from google_ads_config import GOOGLE_ADS_CONFIG
+    except ImportError:
+        return None
+    return GOOGLE_ADS_CONFIG
 
 # Defines the configuration keys required for the script to operate.
 REQUIRED_FIELDS = [
@@ -27,38 +62,310 @@ REQUIRED_FIELDS = [
     "refresh_token", "login_customer_id"
 ]
 
+# Default cap on the number of customer accounts queried concurrently. Each query is
+# a blocking network round-trip, so threads spend nearly all their time waiting.
+# GOOGLE_ADS_MAX_CONCURRENT_QUERIES overrides it to match the developer token's quota.
+DEFAULT_MAX_CONCURRENT_QUERIES = 16
+
+# Output file format for click records, used unless GOOGLE_ADS_OUTPUT_FORMAT is set.
+DEFAULT_OUTPUT_FORMAT = "json"
+# Number of click records buffered before a Parquet row group is written.
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Query workers hand click records to the single output writer thread in batches of
+# this size. The queue holds at most CLICK_QUEUE_MAX_BATCHES batches, which caps only
+# the records waiting to be written. It does not bound overall memory, because each
+# worker builds a customer's full result list before enqueueing any of it.
+CLICK_QUEUE_BATCH_SIZE = 1000
+CLICK_QUEUE_MAX_BATCHES = 100
+# Marks the end of the click queue once every query worker has finished.
+_QUEUE_SENTINEL = object()
+
+# gRPC channel settings for the Google Ads API connection. Large message limits let
+# big click_view batches arrive in one response, and keepalive pings stop idle
+# HTTP/2 connections from being dropped between requests. Limits are kept bounded.
+GRPC_CHANNEL_OPTIONS = {
+    "grpc.max_receive_message_length": 64 * 1024 * 1024,
+    "grpc.max_send_message_length": 16 * 1024 * 1024,
+    "grpc.keepalive_time_ms": 30000,
+    "grpc.keepalive_timeout_ms": 10000,
+    "grpc.keepalive_permit_without_calls": 1,
+    "grpc.http2.max_pings_without_data": 0,
+}
+
+# The public Google Ads API host. With an endpoint override, requests still carry this
+# authority, and the TLS certificate presented by the endpoint is checked against it.
+GOOGLE_ADS_API_AUTHORITY = "googleads.googleapis.com"
+
+# gRPC status codes treated as transient. Queries failing with these are retried with
+# exponential backoff; any other error is permanent and reported immediately.
+# RESOURCE_EXHAUSTED covers rate limits, which concurrent queries are most likely to hit.
+TRANSIENT_STATUS_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+}
+# Maximum number of attempts for a single API query.
+MAX_QUERY_ATTEMPTS = 4
+
+# --- GAQL Queries ---
+
+# Retrieves every enabled, non-manager account anywhere beneath a manager account.
+# customer_client returns all descendants, not just direct children, so one query
+# covers the whole hierarchy.
+HIERARCHY_QUERY = """
+    SELECT
+        customer_client.id
+    FROM customer_client
+    WHERE customer_client.status = 'ENABLED'
+        AND customer_client.manager = FALSE
+"""
+
+# Retrieves the desired fields from the click_view report. The date is filled in
+# once per run, and the resulting query is shared by every customer.
+CLICK_QUERY_TEMPLATE = """
+    SELECT
+        click_view.gclid,
+        ad_group.id,
+        segments.ad_network_type,
+        campaign.id,
+        segments.date
+    FROM click_view
+    WHERE segments.date = '{query_date}'
+"""
+
+# Location of the on-disk access token cache, which lets consecutive runs skip the OAuth2 refresh.
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "google-ads-local", "token.json")
+# A cached token is only reused if it remains valid for at least this long. The margin
+# exceeds google-auth's own refresh threshold, so a reused token is always treated as
+# valid and is never refreshed again on the first request.
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+
 # --- Logging Setup ---
 
-# Configures the logging format and level for the script's output.
-logging.basicConfig(
-    level=logging.INFO, 
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-# Reduces the verbosity of the underlying gRPC library to keep logs clean.
-logging.getLogger("grpc").setLevel(logging.WARNING)
 logger = logging.getLogger()
 
+def configure_logging() -> None:
+    """
+    Configures the logging format and level for the script's output.
+
+    This runs only when the file is executed as a script, so importing the module
+    elsewhere leaves the caller's logging configuration untouched.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    # Reduces the verbosity of the underlying gRPC library to keep logs clean.
+    logging.getLogger("grpc").setLevel(logging.WARNING)
+
+# --- Data Model ---
+
+@dataclass(slots=True)
+class Click:
+    """A single click_view record. Slots keep per-row memory low on large accounts."""
+    gclid: str
+    ad_group_id: int
+    ad_network_type: str
+    campaign_id: int
+    received_date: str
+
+# --- Output Writers ---
+
+class JsonClickWriter:
+    """Streams Click records into a file holding a single JSON array."""
+
+    extension = "json"
+
+    def __init__(self, filename: str):
+        self._file = open(filename, "wb")
+        self._file.write(b"[\n")
+        self.count = 0
+
+    def write(self, clicks: list[Click]) -> None:
+        for click in clicks:
+            if self.count:
+                self._file.write(b",\n")
+            # orjson encodes dataclasses natively, straight to UTF-8 bytes, and is much
+            # faster than the stdlib json module.
+            self._file.write(orjson.dumps(click))
+            self.count += 1
+
+    def close(self) -> None:
+        self._file.write(b"\n]\n")
+        self._file.close()
+
+class ParquetClickWriter:
+    """
+    Streams Click records into a zstd-compressed Parquet file.
+
+    Records are buffered column by column and flushed as a row group once
+    PARQUET_ROW_GROUP_SIZE rows accumulate, so memory use stays bounded.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, filename: str):
+        self._schema = pyarrow.schema([
+            ("gclid", pyarrow.string()),
+            ("ad_group_id", pyarrow.int64()),
+            ("ad_network_type", pyarrow.string()),
+            ("campaign_id", pyarrow.int64()),
+            ("received_date", pyarrow.date32()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(filename, self._schema, compression="zstd")
+        self._columns = {name: [] for name in self._schema.names}
+        self.count = 0
+
+    def write(self, clicks: list[Click]) -> None:
+        for click in clicks:
+            self._columns["gclid"].append(click.gclid)
+            self._columns["ad_group_id"].append(click.ad_group_id)
+            self._columns["ad_network_type"].append(click.ad_network_type)
+            self._columns["campaign_id"].append(click.campaign_id)
+            self._columns["received_date"].append(date.fromisoformat(click.received_date))
+        self.count += len(clicks)
+        if len(self._columns["gclid"]) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns["gclid"]:
+            return
+        self._writer.write_table(pyarrow.Table.from_pydict(self._columns, schema=self._schema))
+        self._columns = {name: [] for name in self._schema.names}
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+# Maps each supported output format to its writer class.
+CLICK_WRITERS = {
+    "json": JsonClickWriter,
+    "parquet": ParquetClickWriter,
+}
+
 # --- Core Functions ---
 
-def build_client_with_refresh() -> GoogleAdsClient:
+def _token_cache_key(refresh_token: str) -> str:
+    """Fingerprints the refresh token so a cached access token is never reused for other credentials."""
+    return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+def load_cached_token(refresh_token: str) -> tuple[str, datetime] | None:
+    """
+    Reads a previously cached OAuth2 access token from disk.
+
+    Args:
+        refresh_token: The refresh token the cached access token must belong to.
+
+    Returns:
+        A (token, expiry) tuple, or None if no usable token is cached.
+        The expiry is a naive UTC datetime, as expected by google-auth.
+    """
+    # Any unreadable or malformed cache is treated as a miss, so startup falls back to a refresh.
+    try:
+        with open(TOKEN_CACHE_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["key"] != _token_cache_key(refresh_token):
+            return None
+        token = cached["token"]
+        expiry = datetime.fromisoformat(cached["expiry"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    # google-auth works with naive UTC expiries, so anything else is not one of ours.
+    if not isinstance(token, str) or not token or expiry.tzinfo is not None:
+        return None
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if expiry - now <= TOKEN_EXPIRY_MARGIN:
+        return None
+    return token, expiry
+
+def save_cached_token(token_creds: GoogleCredentials) -> None:
+    """
+    Persists a freshly refreshed access token so later runs can reuse it.
+
+    Args:
+        token_creds: Credentials holding a valid access token and its expiry.
+    """
+    if not token_creds.token or not token_creds.expiry:
+        return
+    cache_dir = os.path.dirname(TOKEN_CACHE_PATH)
+    try:
+        # The cache holds a live credential, so the directory and file are private to
+        # the current user from the moment they are created.
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        # Writes to a temporary file (created with mode 0600) and swaps it into place,
+        # so overlapping runs never read a partially written cache.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".token-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "key": _token_cache_key(token_creds.refresh_token),
+                    "token": token_creds.token,
+                    "expiry": token_creds.expiry.isoformat(),
+                }, f)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write access token cache to {TOKEN_CACHE_PATH}. Reason: {e}")
+
+def configure_grpc_channel_options(endpoint: str | None = None) -> None:
+    """
+    Applies GRPC_CHANNEL_OPTIONS to the channels created by GoogleAdsClient.get_service.
+
+    The client library exposes no public hook for channel arguments, so its
+    module-level option list is updated in place, overriding any matching keys.
+
+    The update lasts for the rest of the process: every client built afterwards,
+    including one without an endpoint override, uses the merged options.
+
+    Args:
+        endpoint: An optional endpoint override. When set, the default authority
+            is pinned to the Google Ads API host, and this override likewise stays
+            in the library's option list.
+    """
+    channel_options = getattr(googleads_client, "_GRPC_CHANNEL_OPTIONS", None)
+    if not isinstance(channel_options, list):
+        logger.debug("This google-ads version does not expose gRPC channel options. Using library defaults.")
+        return
+
+    merged = dict(channel_options)
+    merged.update(GRPC_CHANNEL_OPTIONS)
+    if endpoint:
+        merged["grpc.default_authority"] = GOOGLE_ADS_API_AUTHORITY
+    channel_options[:] = list(merged.items())
+
+def build_client_with_refresh(creds: dict) -> GoogleAdsClient:
     """
     Constructs and authenticates the GoogleAdsClient object.
 
     This function is responsible for assembling credentials, handling the
     OAuth2 token refresh process, and returning a ready-to-use client instance.
+    Access tokens are cached on disk and reused until shortly before they expire.
+
+    Args:
+        creds: The GOOGLE_ADS_CONFIG dictionary returned by load_config.
 
     Returns:
         An initialized and authenticated GoogleAdsClient instance.
     """
-    creds = GOOGLE_ADS_CONFIG
     # Ensures all necessary credential fields are present in the config.
     missing = [field for field in REQUIRED_FIELDS if not creds.get(field)]
     if missing:
         raise ValueError(f"Missing required Google Ads credentials: {', '.join(missing)}")
 
+    # Reuses a still-valid access token from a previous run, if one is cached.
+    cached_token, cached_expiry = load_cached_token(creds['refresh_token']) or (None, None)
+    if cached_token:
+        logger.debug(f"Using cached access token valid until {cached_expiry.isoformat()} UTC.")
+
     # Creates a Google Credentials object using the provided OAuth2 details.
     token_creds = GoogleCredentials(
-        token=None,  # The access token is populated upon refresh.
+        token=cached_token,  # Without a cached token, the access token is populated upon refresh.
+        expiry=cached_expiry,
         refresh_token=creds['refresh_token'],
         token_uri='https://oauth2.googleapis.com/token',
         client_id=creds['client_id'], 
@@ -66,140 +373,172 @@ def build_client_with_refresh() -> GoogleAdsClient:
         scopes=["https://www.googleapis.com/auth/adwords"]
     )
 
-    # Automatically refreshes the access token if it has expired.
-    if not token_creds.valid or token_creds.expired:
+    # Fetches a new access token only when no usable token was cached.
+    if cached_token is None:
         logger.info("Refreshing access token...")
         token_creds.refresh(Request())
-
-    # Assembles the final configuration dictionary required by the GoogleAdsClient.
-    config = {
-        "developer_token": creds["developer_token"],
-        "client_id": creds["client_id"], 
-        "client_secret": creds["client_secret"],
-        "refresh_token": token_creds.refresh_token,
+        save_cached_token(token_creds)
+
+    # An optional endpoint override. The client still opens its own TLS connection to it,
+    # so the endpoint must present a certificate for the Google Ads API host.
+    endpoint = creds.get("endpoint") or None
+    configure_grpc_channel_options(endpoint)
+
+    # Initializes the client with the authenticated credentials, so the access token
+    # obtained above is used directly rather than refreshed again on the first request.
+    return GoogleAdsClient(
+        credentials=token_creds,
+        developer_token=creds["developer_token"],
+        endpoint=endpoint,
         # The login_customer_id specifies the manager account to authenticate against.
-        "login_customer_id": str(creds["login_customer_id"]).replace("-", ""),
-        "use_proto_plus": True,  # Enables more pythonic response objects.
-    }
-    
-    # Initializes the client using the specified API version.
-    return GoogleAdsClient.load_from_dict(config, version="v19")
-
-def get_full_account_hierarchy(client: GoogleAdsClient, manager_id: str) -> set[str]:
+        login_customer_id=str(creds["login_customer_id"]).replace("-", ""),
+        # Returns raw protobuf messages; proto-plus wrappers slow down attribute access on every row.
+        use_proto_plus=False,
+        version="v19",
+    )
+
+def _is_transient_error(exception: BaseException) -> bool:
+    """Returns True if a failed query is worth retrying."""
+    if isinstance(exception, GoogleAdsException):
+        return exception.error.code() in TRANSIENT_STATUS_CODES
+    # Transport failures may surface as raw gRPC errors without a GoogleAdsFailure.
+    if isinstance(exception, grpc.RpcError) and hasattr(exception, "code"):
+        return exception.code() in TRANSIENT_STATUS_CODES
+    return False
+
+# Retries a call on transient gRPC errors with exponential backoff and jitter. Each
+# attempt reruns the whole call, so retried functions must not keep partial results.
+retry_transient_errors = retry(
+    stop=stop_after_attempt(MAX_QUERY_ATTEMPTS),
+    wait=wait_exponential_jitter(max=30),
+    retry=retry_if_exception(_is_transient_error),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+@retry_transient_errors
+def _fetch_client_customer_ids(googleads_service: Any, manager_id: str) -> set[str]:
+    """Runs the hierarchy query once, retrying transient gRPC errors."""
+    client_customer_ids = set()
+    # search_stream is used for efficiency with potentially large result sets.
+    response_stream = googleads_service.search_stream(
+        customer_id=manager_id, query=HIERARCHY_QUERY
+    )
+
+    for batch in response_stream:
+        for row in batch.results:
+            client_customer_ids.add(str(row.customer_client.id))
+
+    return client_customer_ids
+
+def get_full_account_hierarchy(googleads_service: Any, manager_id: str) -> set[str]:
     """
-    Performs a full recursive traversal of an MCC account hierarchy.
+    Collects every client account within an MCC account hierarchy.
 
-    This function starts at a top-level manager ID and explores all sub-managers
-    to compile a complete list of all underlying, non-manager client accounts.
+    The customer_client resource exposes all descendants of the queried manager,
+    including those beneath sub-managers, so the complete list of underlying,
+    non-manager client accounts is retrieved with a single query.
 
     Args:
-        client: The authenticated GoogleAdsClient instance.
+        googleads_service: The shared GoogleAdsService client.
         manager_id: The 10-digit ID of the top-level manager account to start from.
 
     Returns:
         A set of strings, where each string is a client customer ID.
+
+    Raises:
+        GoogleAdsException: If the hierarchy cannot be read, even after retrying
+            transient errors. Every account depends on this one query, so the run
+            must fail rather than report an empty hierarchy.
     """
-    googleads_service = client.get_service("GoogleAdsService")
-    # A queue to hold the manager IDs that need to be investigated.
-    manager_ids_to_process = deque([manager_id])
-    # A set to prevent re-processing manager accounts in complex or circular hierarchies.
-    processed_manager_ids = {manager_id}
-    client_customer_ids = set()
+    logger.info(f"-> Searching the account hierarchy under manager {manager_id}...")
 
-    logger.info("Beginning recursive search of the account hierarchy...")
+    try:
+        return _fetch_client_customer_ids(googleads_service, manager_id)
+    except GoogleAdsException as e:
+        logger.error(
+            f"Could not access hierarchy under manager {manager_id}. "
+            f"Reason: {e.failure.errors[0].message}"
+        )
+        raise
 
-    while manager_ids_to_process:
-        current_manager_id = manager_ids_to_process.popleft()
-        
-        logger.info(
-            f"-> Searching under manager {current_manager_id}. "
-            f"(Queue size: {len(manager_ids_to_process)})"
+def pack_click_rows(rows: Any, ad_network_type_names: dict[int, str]) -> list[Click]:
+    """
+    Converts a batch of click_view rows into Click records.
+
+    This is the innermost loop of the script, so it avoids per-row method calls:
+    enum names come from a precomputed dict and Click is built positionally.
+
+    Args:
+        rows: The repeated GoogleAdsRow results of one search_stream batch.
+        ad_network_type_names: Maps raw AdNetworkType enum values to their names.
+
+    Returns:
+        A list of Click records, in the order of the rows.
+    """
+    return [
+        Click(
+            row.click_view.gclid,
+            row.ad_group.id,
+            ad_network_type_names.get(row.segments.ad_network_type, "UNKNOWN"),
+            row.campaign.id,
+            row.segments.date,
         )
-        
-        # This GAQL query retrieves all accounts directly linked to the current manager.
-        query = """
-            SELECT
-                customer_client.id,
-                customer_client.manager
-            FROM customer_client
-            WHERE customer_client.status = 'ENABLED'
-        """
-        
-        try:
-            # search_stream is used for efficiency with potentially large result sets.
-            response_stream = googleads_service.search_stream(
-                customer_id=current_manager_id, query=query
-            )
-            
-            for batch in response_stream:
-                for row in batch.results:
-                    customer = row.customer_client
-                    customer_id_str = str(customer.id)
-
-                    # Differentiate between a manager and a client account.
-                    if customer.manager:
-                        # If the linked account is another manager, add it to the queue to be processed.
-                        if customer_id_str not in processed_manager_ids:
-                            processed_manager_ids.add(customer_id_str)
-                            manager_ids_to_process.append(customer_id_str)
-                    else:
-                        # If it's a client account, add it to the final result set.
-                        client_customer_ids.add(customer_id_str)
-
-        except GoogleAdsException as e:
-            logger.warning(
-                f"Could not access hierarchy under manager {current_manager_id}. "
-                f"Skipping this branch. Reason: {e.failure.errors[0].message}"
-            )
-            continue
-            
-    return client_customer_ids
+        for row in rows
+    ]
+
+@retry_transient_errors
+def _fetch_clicks(
+    googleads_service: Any,
+    customer_id: str,
+    query: str,
+    ad_network_type_names: dict[int, str],
+) -> list[Click]:
+    """
+    Runs the click_view query for one customer, retrying transient gRPC errors.
+
+    Each attempt restarts the stream and collects rows into a fresh list, so a
+    failure partway through never leaves duplicate records behind.
+    """
+    results = []
+    # search_stream returns all rows over a single streaming response, avoiding per-page round-trips.
+    response_stream = googleads_service.search_stream(customer_id=customer_id, query=query)
 
-def query_clicks_for_customer(client: GoogleAdsClient, customer_id: str, query_date: str) -> list[dict]:
+    for batch in response_stream:
+        results.extend(pack_click_rows(batch.results, ad_network_type_names))
+
+    return results
+
+def query_clicks_for_customer(
+    googleads_service: Any,
+    customer_id: str,
+    query: str,
+    AuthorizationError: Any,
+    ad_network_type_names: dict[int, str],
+) -> list[Click]:
     """
     Queries the click_view report for a single customer on a specific date.
 
+    The service handle and enum lookups are resolved once by the caller and shared
+    across customers, since looking them up on the client is comparatively costly.
+    Transient gRPC errors are retried with exponential backoff before giving up.
+
     Args:
-        client: The authenticated GoogleAdsClient instance.
+        googleads_service: The shared GoogleAdsService client.
         customer_id: The ID of the customer account to query.
-        query_date: The date for the report in 'YYYY-MM-DD' format.
+        query: The click_view GAQL query, built from CLICK_QUERY_TEMPLATE.
+        AuthorizationError: The AuthorizationErrorEnum.AuthorizationError type.
+        ad_network_type_names: Maps raw AdNetworkType enum values to their names.
 
     Returns:
-        A list of dictionaries, where each dictionary represents a click record,
-        or an empty list if no data is found or an error occurs.
+        A list of Click records, or an empty list if no data is found or an error occurs.
     """
-    # Retrieves the correct error type definition from the client.
-    AuthorizationError = client.get_type("AuthorizationErrorEnum").AuthorizationError
-    service = client.get_service("GoogleAdsService")
-    
-    # This GAQL query retrieves the desired fields from the click_view report.
-    query = f"""
-        SELECT 
-            click_view.gclid,
-            ad_group.id,
-            segments.ad_network_type, 
-            campaign.id, 
-            segments.date
-        FROM click_view
-        WHERE segments.date = '{query_date}'
-    """
-    
     results = []
     try:
-        response = service.search(customer_id=customer_id, query=query)
-        
-        # The response is an iterator, so it must be converted to a list to check its size.
-        processed_rows = list(response)
-        if processed_rows:
-             logger.info(f"Successfully retrieved {len(processed_rows)} rows for customer {customer_id}.")
-             for row in processed_rows:
-                results.append({
-                    "gclid": row.click_view.gclid,
-                    "ad_group_id": row.ad_group.id,
-                    "ad_network_type": row.segments.ad_network_type.name,
-                    "campaign_id": row.campaign.id,
-                    "received_date": row.segments.date
-                })
+        results = _fetch_clicks(googleads_service, customer_id, query, ad_network_type_names)
+
+        if results:
+            logger.info(f"Successfully retrieved {len(results)} rows for customer {customer_id}.")
         else:
             logger.info(f"Query successful for customer {customer_id}, but it returned no data for the specified date.")
 
@@ -212,15 +551,96 @@ def query_clicks_for_customer(client: GoogleAdsClient, customer_id: str, query_d
                 return []
         # Logs any other, unexpected API errors.
         logger.warning(f"Could not query customer {customer_id}. Reason: {e.failure.errors[0].message}")
-        
+
+    except grpc.RpcError as e:
+        # Transport-level failures without a GoogleAdsFailure, including transient
+        # errors that persisted through every retry attempt.
+        logger.warning(f"Could not query customer {customer_id}. Reason: {e}")
+
     return results
 
+def _query_and_enqueue_clicks(click_queue: queue.Queue, *query_args: Any) -> int:
+    """
+    Queries one customer's clicks and hands them to the writer thread in batches.
+
+    Rows are only enqueued once the whole query has succeeded, so a stream that is
+    retried after failing partway through never writes duplicate records. The cost
+    is that up to one complete result set per worker is held in memory at a time.
+
+    Args:
+        click_queue: The queue consumed by the output writer thread.
+        *query_args: Positional arguments for query_clicks_for_customer.
+
+    Returns:
+        The number of click records enqueued.
+    """
+    clicks = query_clicks_for_customer(*query_args)
+    for start in range(0, len(clicks), CLICK_QUEUE_BATCH_SIZE):
+        click_queue.put(clicks[start:start + CLICK_QUEUE_BATCH_SIZE])
+    return len(clicks)
+
+def _drain_click_queue(
+    click_queue: queue.Queue,
+    writer: JsonClickWriter | ParquetClickWriter,
+    errors: list[Exception],
+) -> None:
+    """
+    Writes click batches from the queue until the sentinel arrives.
+
+    Runs on the single writer thread. If writing fails, the error is recorded and
+    the queue keeps draining, so query workers never block on a full queue.
+    """
+    while True:
+        batch = click_queue.get()
+        if batch is _QUEUE_SENTINEL:
+            return
+        if errors:
+            continue
+        try:
+            writer.write(batch)
+        except Exception as e:
+            errors.append(e)
+
 
 def main():
     """The main entry point and orchestrator for the script."""
+    config = load_config()
+    if config is None:
+        logger.error("A google_ads_config.py file with a GOOGLE_ADS_CONFIG dictionary is required.")
+        return
+
     try:
-        client = build_client_with_refresh()
-        login_cid = str(GOOGLE_ADS_CONFIG["login_customer_id"]).replace("-", "")
+        max_concurrent_queries = int(
+            config.get("max_concurrent_queries", DEFAULT_MAX_CONCURRENT_QUERIES)
+        )
+    except ValueError:
+        max_concurrent_queries = 0
+    if max_concurrent_queries < 1:
+        logger.error(
+            f"Invalid GOOGLE_ADS_MAX_CONCURRENT_QUERIES value "
+            f"'{config.get('max_concurrent_queries')}'. It must be a positive integer."
+        )
+        return
+
+    output_format = config.get("output_format") or DEFAULT_OUTPUT_FORMAT
+    writer_class = CLICK_WRITERS.get(output_format)
+    if writer_class is None:
+        logger.error(f"Unsupported output format '{output_format}'. Choose one of: {', '.join(CLICK_WRITERS)}.")
+        return
+    if writer_class is ParquetClickWriter and pyarrow is None:
+        logger.error("Parquet output requires the pyarrow package. Install it with 'pip install pyarrow'.")
+        return
+
+    try:
+        client = build_client_with_refresh(config)
+        login_cid = str(config["login_customer_id"]).replace("-", "")
+        # Resolves the service and enum types once; each get_service call opens a new gRPC channel.
+        googleads_service = client.get_service("GoogleAdsService")
+        AuthorizationError = client.get_type("AuthorizationErrorEnum").AuthorizationError
+        # Raw protobuf enums are plain integers, so their names are looked up in a prebuilt dict.
+        ad_network_type_names = {
+            value: name for name, value in client.get_type("AdNetworkTypeEnum").AdNetworkType.items()
+        }
     except (ValueError, GoogleAdsException) as e:
         logger.error(f"Failed to initialize Google Ads client. Please check credentials. Error: {e}")
         return
@@ -228,39 +648,76 @@ def main():
     # Sets the report to run for the previous full day based on UTC.
     query_date = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
     logger.info(f"Starting job to query click data for date: {query_date}")
-
-    all_data = []
+    click_query = CLICK_QUERY_TEMPLATE.format(query_date=query_date)
 
     try:
         # Step 1: Discover all client accounts within the entire MCC hierarchy.
-        customer_ids_to_query = get_full_account_hierarchy(client, login_cid)
+        customer_ids_to_query = get_full_account_hierarchy(googleads_service, login_cid)
         logger.info(
             f"Hierarchy scan complete. Found {len(customer_ids_to_query)} total client accounts. "
             f"Now querying each for click data..."
         )
 
-        # Step 2: Loop through the discovered accounts and fetch click data.
-        for i, cid in enumerate(sorted(list(customer_ids_to_query))):
-            # Provides progress updates for large jobs.
-            if (i + 1) % 50 == 0:
-                logger.info(f"Query progress: {i + 1} of {len(customer_ids_to_query)} accounts...")
-            
-            data = query_clicks_for_customer(client, cid, query_date)
-            if data:
-                all_data.extend(data)
-        
+        # Step 2: Query the discovered accounts concurrently. Workers push their click
+        # records onto a queue, and a single writer thread streams them into a
+        # timestamped output file, so serialization runs separately from the queries.
+        # The file is written under a ".partial" name and only moved into place once
+        # every query and the writer have finished, so a failed run leaves no output.
+        ts = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H-%M-%SZ')
+        filename = f"google_ads_clicks_{ts}.{writer_class.extension}"
+        partial_filename = f"{filename}.partial"
+        writer = writer_class(partial_filename)
+        try:
+            click_queue = queue.Queue(maxsize=CLICK_QUEUE_MAX_BATCHES)
+            writer_errors = []
+            writer_thread = threading.Thread(
+                target=_drain_click_queue, args=(click_queue, writer, writer_errors), name="click-writer"
+            )
+            writer_thread.start()
+
+            try:
+                with ThreadPoolExecutor(max_workers=max_concurrent_queries) as executor:
+                    futures = [
+                        executor.submit(
+                            _query_and_enqueue_clicks, click_queue,
+                            googleads_service, cid, click_query, AuthorizationError, ad_network_type_names
+                        )
+                        for cid in customer_ids_to_query
+                    ]
+                    try:
+                        for i, future in enumerate(as_completed(futures)):
+                            # Provides progress updates for large jobs.
+                            if (i + 1) % 50 == 0:
+                                logger.info(f"Query progress: {i + 1} of {len(customer_ids_to_query)} accounts...")
+
+                            future.result()
+                    except BaseException:
+                        # Stops at the first failure or interrupt: queued customers are cancelled
+                        # instead of being queried, and only in-flight queries are waited for.
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        raise
+            finally:
+                click_queue.put(_QUEUE_SENTINEL)
+                writer_thread.join()
+                writer.close()
+
+            if writer_errors:
+                raise writer_errors[0]
+        except BaseException:
+            try:
+                os.remove(partial_filename)
+            except OSError:
+                pass
+            raise
+
         # Step 3: Handle the case where no data is returned.
-        if not all_data:
+        if not writer.count:
+            os.remove(partial_filename)
             logger.info("Job finished. No click data was found for any accessible accounts for the specified date.")
             return
 
-        # Step 4: Write the collected data to a timestamped JSON file.
-        ts = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H-%M-%SZ')
-        filename = f"google_ads_clicks_{ts}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=4)
-
-        logger.info(f"Success! Wrote {len(all_data)} click records to local file: {filename}")
+        os.replace(partial_filename, filename)
+        logger.info(f"Success! Wrote {writer.count} click records to local file: {filename}")
 
     except Exception as e:
         # Catch any other unexpected errors during the main execution loop.
@@ -269,4 +726,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configure_logging()
     main()